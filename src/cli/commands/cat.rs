@@ -38,11 +38,8 @@ pub async fn execute(
 
     // Add prompt instructions if requested
     if prompt {
-        result = format!(
-            "{}
-{}",
-            result, PROMPT
-        );
+        result.push('\n');
+        result.push_str(PROMPT);
         info!("Added prompt instructions from constant");
     }
 
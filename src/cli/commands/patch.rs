@@ -30,10 +30,13 @@ pub async fn execute(json_file: Option<String>, dry_run: bool, backup: bool) ->
     // Read JSON from file, stdin, or clipboard
     let json_content = match json_file.as_deref() {
         Some("-") => {
-            use std::io::{self, BufRead};
-            let stdin = io::stdin();
-            let lines: Result<Vec<_>, _> = stdin.lock().lines().collect();
-            lines.context("Failed to read from stdin")?.join("\n")
+            use std::io::{self, Read};
+            let mut content = String::new();
+            io::stdin()
+                .lock()
+                .read_to_string(&mut content)
+                .context("Failed to read from stdin")?;
+            content
         }
         Some(file_path) => fs::read_to_string(file_path)
             .with_context(|| format!("Failed to read JSON file: {}", file_path))?,
@@ -1,11 +1,17 @@
-use crate::core::structure_generator::generate_directory_structure;
+use crate::core::structure_generator::generate_directory_structure_relative;
 use crate::utils::language_detection::get_language_from_extension;
 use crate::utils::text_processing::remove_comments_and_docstrings;
 use anyhow::Result;
-use std::path::PathBuf;
-use tokio::fs;
+use std::collections::VecDeque;
+use std::fmt::Write;
+use std::path::{Path, PathBuf};
+use tokio::task;
 use tracing::{debug, instrument, warn};
 
+// Upper bound on files read ahead of the one being written
+const READ_AHEAD: usize = 32;
+
+// Files are written in the order given, normally collect_files' sorted order
 #[instrument(skip(files))]
 pub async fn concatenate_files(
     files: &[PathBuf],
@@ -16,10 +22,17 @@ pub async fn concatenate_files(
     println!("\n🔨 Processing {} files...", files.len());
     let mut result = String::new();
 
+    // Relative paths are shared by the structure and the file headers
+    let current_dir = std::env::current_dir().unwrap_or_default();
+    let relative_paths: Vec<&Path> = files
+        .iter()
+        .map(|file_path| file_path.strip_prefix(&current_dir).unwrap_or(file_path))
+        .collect();
+
     // Generate directory structure
     result.push_str("# Project Structure\n\n");
     result.push_str("```\n");
-    let structure = generate_directory_structure(files);
+    let structure = generate_directory_structure_relative(&relative_paths);
     for line in structure {
         result.push_str(&line);
         result.push('\n');
@@ -29,43 +42,41 @@ pub async fn concatenate_files(
     // Add file contents
     result.push_str("# File Contents\n\n");
 
-    let current_dir = std::env::current_dir().unwrap_or_default();
+    // Read and strip files on the blocking pool, up to READ_AHEAD ahead
+    let mut queued = files.iter();
+    let mut pending = VecDeque::with_capacity(READ_AHEAD);
 
-    for file_path in files {
-        let relative_path = file_path.strip_prefix(&current_dir).unwrap_or(file_path);
+    for (file_path, relative_path) in files.iter().zip(&relative_paths) {
+        while pending.len() < READ_AHEAD
+            && let Some(next_path) = queued.next()
+        {
+            let next_path = next_path.clone();
+            pending.push_back(task::spawn_blocking(move || {
+                read_and_process(&next_path, ignore_comments, ignore_docstrings)
+            }));
+        }
 
-        result.push_str(&format!("## {}\n\n", relative_path.display()));
+        let label = relative_path.to_string_lossy();
+        writeln!(result, "## {}\n", label)?;
 
-        match fs::read_to_string(file_path).await {
-            Ok(content) => {
-                let language = get_language_from_extension(file_path);
-                let processed_content = remove_comments_and_docstrings(
-                    &content,
-                    language,
-                    ignore_comments,
-                    ignore_docstrings,
-                );
+        let read_result = pending
+            .pop_front()
+            .expect("a read is queued for every file")
+            .await?;
 
-                result.push_str(&format!("```{}\n", language));
-                result.push_str(&processed_content);
+        match read_result {
+            Ok((language, content)) => {
+                writeln!(result, "```{}", language)?;
+                result.push_str(&content);
                 result.push_str("\n```\n\n");
 
-                println!(
-                    "  ✓ {} ({} chars, {})",
-                    relative_path.display(),
-                    processed_content.len(),
-                    language
-                );
-                debug!(
-                    "Added file: {} ({} chars)",
-                    relative_path.display(),
-                    processed_content.len()
-                );
+                println!("  ✓ {} ({} chars, {})", label, content.len(), language);
+                debug!("Added file: {} ({} chars)", label, content.len());
             }
             Err(e) => {
-                println!("  ✗ {} - Error: {}", relative_path.display(), e);
+                println!("  ✗ {} - Error: {}", label, e);
                 warn!("Could not read file {}: {}", file_path.display(), e);
-                result.push_str(&format!("*Error reading file: {}*\n\n", e));
+                writeln!(result, "*Error reading file: {}*\n", e)?;
             }
         }
     }
@@ -73,9 +84,27 @@ pub async fn concatenate_files(
     println!("\n📝 Total content: {} characters", result.len());
 
     if let Some(output_path) = output_file {
-        fs::write(output_path, &result).await?;
+        std::fs::write(output_path, &result)?;
         println!("💾 Output written to: {}", output_path);
     }
 
     Ok(result)
 }
+
+fn read_and_process(
+    path: &Path,
+    ignore_comments: bool,
+    ignore_docstrings: bool,
+) -> std::io::Result<(&'static str, String)> {
+    let content = std::fs::read_to_string(path)?;
+    let language = get_language_from_extension(path);
+
+    if !ignore_comments && !ignore_docstrings {
+        return Ok((language, content));
+    }
+
+    Ok((
+        language,
+        remove_comments_and_docstrings(&content, language, ignore_comments, ignore_docstrings),
+    ))
+}
@@ -1,61 +1,146 @@
 use crate::config::patterns::{DEFAULT_EXCLUDE_PATTERNS, DEFAULT_INCLUDE_PATTERNS};
 use crate::core::pattern_matcher::PatternMatcher;
+use crate::core::structure_generator::generate_file_tree_relative;
 use anyhow::Result;
-use std::collections::BTreeMap;
+use std::io::Read;
 use std::path::{Path, PathBuf};
-use tokio::fs;
+use std::sync::{Arc, LazyLock};
+use tokio::task;
 use tracing::{debug, info, instrument};
 use walkdir::{DirEntry, WalkDir};
 
+// The default pattern sets never change, so they are compiled once per process
+static DEFAULT_EXCLUDE_MATCHER: LazyLock<Arc<PatternMatcher>> =
+    LazyLock::new(|| Arc::new(PatternMatcher::new(DEFAULT_EXCLUDE_PATTERNS)));
+static DEFAULT_INCLUDE_MATCHER: LazyLock<Arc<PatternMatcher>> =
+    LazyLock::new(|| Arc::new(PatternMatcher::new(DEFAULT_INCLUDE_PATTERNS)));
+
+// Number of leading bytes inspected for NUL bytes by the binary check
+const BINARY_CHECK_LEN: usize = 1024;
+
 pub fn is_binary_file(content: &[u8]) -> bool {
-    let check_len = content.len().min(1024);
+    let check_len = content.len().min(BINARY_CHECK_LEN);
     content[..check_len].contains(&0)
 }
 
-fn should_skip_directory(entry: &DirEntry, exclude_matcher: &PatternMatcher) -> bool {
-    let path = entry.path();
-
-    // Quick checks for common directories to skip
-    if let Some(
-        ".git" | ".svn" | ".hg" | ".bzr" | "node_modules" | "__pycache__" | ".mypy_cache"
-        | ".pytest_cache" | ".vscode" | ".idea" | "target" | "build" | "dist" | "out",
-    ) = path.file_name().and_then(|n| n.to_str())
-    {
-        return true;
+fn should_skip_directory(
+    entry: &DirEntry,
+    exclude_matcher: &PatternMatcher,
+    root_checked: bool,
+) -> bool {
+    // Below the root, parents have already been checked by the walk
+    if entry.depth() == 0 {
+        !root_checked && exclude_matcher.matches_path(entry.path())
+    } else {
+        exclude_matcher.matches_last_component(entry.path())
     }
-
-    exclude_matcher.matches_path(path)
 }
 
 fn should_include_file(
     path: &Path,
     exclude_matcher: &PatternMatcher,
     include_matcher: &PatternMatcher,
-    max_size_bytes: u64,
+    parents_checked: bool,
 ) -> bool {
     // Quick exclusion check
-    if exclude_matcher.matches_path(path) {
+    let excluded = if parents_checked {
+        exclude_matcher.matches_last_component(path)
+    } else {
+        exclude_matcher.matches_path(path)
+    };
+    if excluded {
         return false;
     }
 
     // Quick inclusion check
-    if !include_matcher.matches_path(path) {
-        return false;
-    }
+    include_matcher.matches_path(path)
+}
 
-    // Size and binary checks
-    if let Ok(metadata) = std::fs::metadata(path) {
-        metadata.len() <= max_size_bytes && metadata.len() > 0
+fn is_within_size_limit(size: u64, max_size_bytes: u64) -> bool {
+    size <= max_size_bytes && size > 0
+}
+
+fn entry_file_size(entry: &DirEntry) -> Option<u64> {
+    // Symlinks are resolved to their target
+    if entry.file_type().is_file() {
+        entry.metadata().ok().map(|metadata| metadata.len())
+    } else if entry.path_is_symlink() {
+        std::fs::metadata(entry.path())
+            .ok()
+            .filter(|metadata| metadata.is_file())
+            .map(|metadata| metadata.len())
     } else {
-        false
+        None
     }
 }
 
-async fn is_text_file(path: &Path) -> bool {
-    match fs::read(path).await {
-        Ok(content) => !is_binary_file(&content),
-        Err(_) => false,
+fn is_text_file(path: &Path, size: u64) -> bool {
+    // Only the bytes the binary check looks at are read
+    let mut head = [0u8; BINARY_CHECK_LEN];
+    let head = &mut head[..size.min(BINARY_CHECK_LEN as u64) as usize];
+
+    std::fs::File::open(path)
+        .and_then(|mut file| file.read_exact(head))
+        .is_ok_and(|()| !is_binary_file(head))
+}
+
+// Returns the files under `root` that pass every filter. With `subdirectories`,
+// only direct children are visited and subdirectories are returned instead.
+// `root_checked` marks a root such a walk has already let through
+fn walk_directory(
+    root: &Path,
+    root_checked: bool,
+    exclude_matcher: &PatternMatcher,
+    include_matcher: &PatternMatcher,
+    max_size_bytes: u64,
+    mut subdirectories: Option<&mut Vec<PathBuf>>,
+) -> Vec<PathBuf> {
+    let mut walker = WalkDir::new(root);
+    if subdirectories.is_some() {
+        walker = walker.max_depth(1);
     }
+
+    let mut files = Vec::new();
+
+    for entry in walker
+        .into_iter()
+        .filter_entry(|e| {
+            if e.file_type().is_dir() {
+                !should_skip_directory(e, exclude_matcher, root_checked)
+            } else {
+                true
+            }
+        })
+        .filter_map(|e| e.ok())
+    {
+        if entry.file_type().is_dir() {
+            if entry.depth() > 0
+                && let Some(subdirectories) = subdirectories.as_deref_mut()
+            {
+                subdirectories.push(entry.into_path());
+            }
+            continue;
+        }
+
+        if !entry.file_type().is_file() && !entry.path_is_symlink() {
+            continue;
+        }
+
+        let entry_path = entry.path();
+
+        if !should_include_file(entry_path, exclude_matcher, include_matcher, true) {
+            continue;
+        }
+
+        if let Some(size) = entry_file_size(&entry)
+            && is_within_size_limit(size, max_size_bytes)
+            && is_text_file(entry_path, size)
+        {
+            files.push(entry.into_path());
+        }
+    }
+
+    files
 }
 
 #[instrument(skip(additional_excludes, additional_includes))]
@@ -67,64 +152,91 @@ pub async fn collect_files(
 ) -> Result<Vec<PathBuf>> {
     let max_size_bytes = max_size_mb * 1024 * 1024;
 
-    // Build pattern matchers
-    let mut exclude_patterns = DEFAULT_EXCLUDE_PATTERNS.to_vec();
-    exclude_patterns.extend(additional_excludes.iter().map(|s| s.as_str()));
-    let exclude_patterns: Vec<String> = exclude_patterns.iter().map(|s| s.to_string()).collect();
-
-    let include_patterns: Vec<String> = if additional_includes.is_empty() {
-        DEFAULT_INCLUDE_PATTERNS
-            .iter()
-            .map(|s| s.to_string())
-            .collect()
+    // Build pattern matchers, reusing the precompiled defaults when possible
+    let exclude_matcher = if additional_excludes.is_empty() {
+        Arc::clone(&DEFAULT_EXCLUDE_MATCHER)
     } else {
-        additional_includes.to_vec()
+        let exclude_patterns: Vec<&str> = DEFAULT_EXCLUDE_PATTERNS
+            .iter()
+            .copied()
+            .chain(additional_excludes.iter().map(String::as_str))
+            .collect();
+        Arc::new(PatternMatcher::new(&exclude_patterns))
     };
 
-    let exclude_matcher = PatternMatcher::new(&exclude_patterns);
-    let include_matcher = PatternMatcher::new(&include_patterns);
+    let include_matcher = if additional_includes.is_empty() {
+        Arc::clone(&DEFAULT_INCLUDE_MATCHER)
+    } else {
+        Arc::new(PatternMatcher::new(additional_includes))
+    };
 
-    debug!("Using {} exclude patterns", exclude_patterns.len());
-    debug!("Using {} include patterns", include_patterns.len());
+    debug!(
+        "Using {} exclude patterns",
+        DEFAULT_EXCLUDE_PATTERNS.len() + additional_excludes.len()
+    );
+    debug!(
+        "Using {} include patterns",
+        if additional_includes.is_empty() {
+            DEFAULT_INCLUDE_PATTERNS.len()
+        } else {
+            additional_includes.len()
+        }
+    );
 
     let mut all_files = Vec::new();
 
     for path in paths {
-        if path.is_file() {
-            if should_include_file(path, &exclude_matcher, &include_matcher, max_size_bytes)
-                && is_text_file(path).await
+        let Ok(metadata) = std::fs::metadata(path) else {
+            continue;
+        };
+
+        if metadata.is_file() {
+            if should_include_file(path, &exclude_matcher, &include_matcher, false)
+                && is_within_size_limit(metadata.len(), max_size_bytes)
+                && is_text_file(path, metadata.len())
             {
                 all_files.push(path.clone());
             }
-        } else if path.is_dir() {
-            for entry in WalkDir::new(path)
+        } else if metadata.is_dir() {
+            // Each subdirectory of the root is walked on its own blocking task
+            let mut subdirectories = Vec::new();
+            all_files.extend(walk_directory(
+                path,
+                false,
+                &exclude_matcher,
+                &include_matcher,
+                max_size_bytes,
+                Some(&mut subdirectories),
+            ));
+
+            let walks: Vec<_> = subdirectories
                 .into_iter()
-                .filter_entry(|e| {
-                    if e.path().is_dir() {
-                        !should_skip_directory(e, &exclude_matcher)
-                    } else {
-                        true
-                    }
+                .map(|subdirectory| {
+                    let exclude_matcher = Arc::clone(&exclude_matcher);
+                    let include_matcher = Arc::clone(&include_matcher);
+                    task::spawn_blocking(move || {
+                        walk_directory(
+                            &subdirectory,
+                            true,
+                            &exclude_matcher,
+                            &include_matcher,
+                            max_size_bytes,
+                            None,
+                        )
+                    })
                 })
-                .filter_map(|e| e.ok())
-            {
-                let entry_path = entry.path();
-
-                if entry_path.is_file()
-                    && should_include_file(
-                        entry_path,
-                        &exclude_matcher,
-                        &include_matcher,
-                        max_size_bytes,
-                    )
-                    && is_text_file(entry_path).await
-                {
-                    all_files.push(entry_path.to_path_buf());
-                }
+                .collect();
+
+            for walk in walks {
+                all_files.extend(walk.await?);
             }
         }
     }
 
+    // Path ordering is component-wise, the same order the tree is drawn in
+    all_files.sort_unstable();
+    all_files.dedup();
+
     info!("Found {} files after filtering", all_files.len());
 
     if !all_files.is_empty() {
@@ -138,76 +250,12 @@ pub async fn collect_files(
 
 fn print_file_tree(files: &[PathBuf]) {
     let current_dir = std::env::current_dir().unwrap_or_default();
-    let mut tree = BTreeMap::new();
-
-    // Build tree structure
-    for file in files {
-        let relative_path = file.strip_prefix(&current_dir).unwrap_or(file);
-        add_file_to_tree(&mut tree, relative_path);
-    }
-
-    // Print tree
-    print_tree_recursive(&tree, "", true);
-}
-
-fn add_file_to_tree(tree: &mut BTreeMap<String, TreeNode>, path: &Path) {
-    let components: Vec<_> = path.components().collect();
-    if components.is_empty() {
-        return;
-    }
-
-    let mut current = tree;
+    let relative_paths: Vec<&Path> = files
+        .iter()
+        .map(|file| file.strip_prefix(&current_dir).unwrap_or(file))
+        .collect();
 
-    for (i, component) in components.iter().enumerate() {
-        let name = component.as_os_str().to_string_lossy().to_string();
-        let is_file = i == components.len() - 1;
-
-        if is_file {
-            current.insert(name, TreeNode::File);
-            break;
-        }
-
-        let entry = current
-            .entry(name)
-            .or_insert_with(|| TreeNode::Directory(BTreeMap::new()));
-
-        match entry {
-            TreeNode::Directory(subtree) => {
-                current = subtree;
-            }
-            TreeNode::File => break,
-        }
-    }
-}
-
-#[derive(Debug)]
-enum TreeNode {
-    File,
-    Directory(BTreeMap<String, TreeNode>),
-}
-
-fn print_tree_recursive(tree: &BTreeMap<String, TreeNode>, prefix: &str, is_root: bool) {
-    let items: Vec<_> = tree.iter().collect();
-
-    for (i, (name, node)) in items.iter().enumerate() {
-        let is_last = i == items.len() - 1;
-        let connector = if is_root {
-            if is_last { "└── " } else { "├── " }
-        } else if is_last {
-            "└── "
-        } else {
-            "├── "
-        };
-
-        match node {
-            TreeNode::File => {
-                println!("{}{}📄 {}", prefix, connector, name);
-            }
-            TreeNode::Directory(subtree) => {
-                println!("{}{}📁 {}/", prefix, connector, name);
-                let new_prefix = format!("{}{}", prefix, if is_last { "    " } else { "│   " });
-                print_tree_recursive(subtree, &new_prefix, false);
-            }
-        }
+    for line in generate_file_tree_relative(&relative_paths) {
+        println!("{}", line);
     }
 }
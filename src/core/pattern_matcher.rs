@@ -1,6 +1,11 @@
+use crate::utils::language_detection::file_extension;
+use regex::bytes::{Regex, RegexBuilder};
 use std::collections::HashSet;
 use std::path::Path;
-use tracing::{debug, instrument};
+use tracing::{debug, instrument, warn};
+
+// The regex crate's default compiled size limit
+const GLOB_UNION_SIZE_LIMIT: usize = 10 * (1 << 20);
 
 #[derive(Debug)]
 pub struct PatternMatcher {
@@ -9,37 +14,27 @@ pub struct PatternMatcher {
     exact_extensions: HashSet<String>,
     exact_directories: HashSet<String>,
 
-    // Simple patterns that need more complex matching
-    glob_patterns: Vec<GlobPattern>,
-}
-
-#[derive(Debug)]
-struct GlobPattern {
-    parts: Vec<GlobPart>,
-}
-
-#[derive(Debug)]
-enum GlobPart {
-    Literal(String),
-    Star,       // *
-    DoubleStar, // **
-    Question,   // ?
+    // Remaining glob patterns, unioned into anchored regexes: a single one
+    // unless the list is too large to compile as one automaton
+    glob_regexes: Vec<Regex>,
 }
 
 impl PatternMatcher {
-    pub fn new(patterns: &[String]) -> Self {
+    pub fn new<S: AsRef<str>>(patterns: &[S]) -> Self {
         let mut exact_filenames = HashSet::new();
         let mut exact_extensions = HashSet::new();
         let mut exact_directories = HashSet::new();
-        let mut glob_patterns = Vec::new();
+        let mut glob_patterns: Vec<String> = Vec::new();
+        let mut seen_globs = HashSet::new();
 
         for pattern in patterns {
             Self::categorize_pattern(
-                pattern.trim(),
+                pattern.as_ref().trim(),
                 &mut exact_filenames,
                 &mut exact_extensions,
                 &mut exact_directories,
                 &mut glob_patterns,
+                &mut seen_globs,
             );
         }
 
@@ -55,7 +50,7 @@ impl PatternMatcher {
             exact_filenames,
             exact_extensions,
             exact_directories,
-            glob_patterns,
+            glob_regexes: Self::compile_globs(&glob_patterns),
         }
     }
 
@@ -64,7 +59,8 @@ impl PatternMatcher {
         exact_filenames: &mut HashSet<String>,
         exact_extensions: &mut HashSet<String>,
         exact_directories: &mut HashSet<String>,
-        glob_patterns: &mut Vec<GlobPattern>,
+        glob_patterns: &mut Vec<String>,
+        seen_globs: &mut HashSet<String>,
     ) {
         // Extension patterns (*.rs, *.py, etc.)
         if let Some(ext) = pattern.strip_prefix("*.")
@@ -93,53 +89,104 @@ impl PatternMatcher {
             return;
         }
 
-        // Everything else becomes a glob pattern
-        glob_patterns.push(Self::parse_glob_pattern(pattern));
+        // Everything else becomes a glob pattern, each distinct one once
+        let regex = Self::glob_to_regex(pattern);
+        if seen_globs.insert(regex.clone()) {
+            glob_patterns.push(regex);
+        }
     }
 
-    fn parse_glob_pattern(pattern: &str) -> GlobPattern {
-        let mut parts = Vec::new();
-        let mut current_literal = String::new();
+    // `**` crosses path separators, `*` and `?` stay within one component.
+    // Runs of any length are matched bytewise, which keeps the compiled
+    // automaton small; `?` still consumes one whole UTF-8 character
+    fn glob_to_regex(pattern: &str) -> String {
+        let mut regex = String::with_capacity(pattern.len() * 2);
+        let mut literal = String::new();
         let mut chars = pattern.chars().peekable();
 
         while let Some(ch) = chars.next() {
-            match ch {
-                '*' => {
-                    if chars.peek() == Some(&'*') {
-                        chars.next(); // consume second *
-                        if !current_literal.is_empty() {
-                            parts.push(GlobPart::Literal(current_literal.clone()));
-                            current_literal.clear();
-                        }
-                        parts.push(GlobPart::DoubleStar);
-                    } else {
-                        if !current_literal.is_empty() {
-                            parts.push(GlobPart::Literal(current_literal.clone()));
-                            current_literal.clear();
-                        }
-                        parts.push(GlobPart::Star);
-                    }
+            let token = match ch {
+                '*' if chars.peek() == Some(&'*') => {
+                    chars.next(); // consume second *
+                    "(?s-u:.)*"
                 }
-                '?' => {
-                    if !current_literal.is_empty() {
-                        parts.push(GlobPart::Literal(current_literal.clone()));
-                        current_literal.clear();
-                    }
-                    parts.push(GlobPart::Question);
+                '*' => "(?-u:[^/])*",
+                '?' => "[^/]",
+                _ => {
+                    literal.push(ch);
+                    continue;
                 }
-                _ => current_literal.push(ch),
-            }
+            };
+            regex.push_str(&regex::escape(&literal));
+            literal.clear();
+            regex.push_str(token);
         }
+        regex.push_str(&regex::escape(&literal));
+
+        regex
+    }
 
-        if !current_literal.is_empty() {
-            parts.push(GlobPart::Literal(current_literal));
+    // One alternation means a single regex search per path, however many globs
+    fn compile_globs(fragments: &[String]) -> Vec<Regex> {
+        let mut regexes = Vec::new();
+        if !fragments.is_empty() {
+            Self::compile_union(fragments, GLOB_UNION_SIZE_LIMIT, &mut regexes);
         }
+        regexes
+    }
 
-        GlobPattern { parts }
+    fn compile_union(fragments: &[String], size_limit: usize, regexes: &mut Vec<Regex>) {
+        let union = format!("^(?:{})$", fragments.join("|"));
+
+        match RegexBuilder::new(&union).size_limit(size_limit).build() {
+            Ok(regex) => regexes.push(regex),
+            // Very long pattern lists exceed the regex size limit as a single
+            // union, so they are split until each part compiles
+            Err(_) if fragments.len() > 1 => {
+                let (first, second) = fragments.split_at(fragments.len() / 2);
+                Self::compile_union(first, size_limit, regexes);
+                Self::compile_union(second, size_limit, regexes);
+            }
+            Err(e) => warn!("Ignoring glob pattern that cannot be compiled: {}", e),
+        }
     }
 
-    #[instrument(skip(self))]
+    #[instrument(level = "trace", skip(self))]
     pub fn matches_path(&self, path: &Path) -> bool {
+        if self.matches_file_name(path) {
+            return true;
+        }
+
+        // Exact directory check - check if any path component matches
+        if !self.exact_directories.is_empty() {
+            for component in path.components() {
+                if let Some(dir_name) = component.as_os_str().to_str()
+                    && self.exact_directories.contains(dir_name)
+                {
+                    debug!("Directory match: {}", dir_name);
+                    return true;
+                }
+            }
+        }
+
+        self.matches_glob(path)
+    }
+
+    // Like matches_path, but only the last component is checked against the
+    // exact directory names: a top-down walk has already checked the parents
+    #[instrument(level = "trace", skip(self))]
+    pub fn matches_last_component(&self, path: &Path) -> bool {
+        if let Some(dir_name) = path.file_name().and_then(|n| n.to_str())
+            && self.exact_directories.contains(dir_name)
+        {
+            debug!("Directory match: {}", dir_name);
+            return true;
+        }
+
+        self.matches_file_name(path) || self.matches_glob(path)
+    }
+
+    fn matches_file_name(&self, path: &Path) -> bool {
         let filename = path
             .file_name()
             .map(|n| n.to_string_lossy())
@@ -152,100 +199,57 @@ impl PatternMatcher {
         }
 
         // Exact extension check
-        if let Some(ext) = path.extension().and_then(|e| e.to_str())
+        if let Some(ext) = file_extension(&filename)
             && self.exact_extensions.contains(ext)
         {
             debug!("Extension match: .{}", ext);
             return true;
         }
 
-        // Exact directory check - check if any path component matches
-        for component in path.components() {
-            if let Some(dir_name) = component.as_os_str().to_str()
-                && self.exact_directories.contains(dir_name)
-            {
-                debug!("Directory match: {}", dir_name);
-                return true;
-            }
-        }
-
-        // Glob pattern matching (only if no fast matches)
-        let path_str = path.to_string_lossy();
-        self.glob_patterns
-            .iter()
-            .any(|glob| Self::matches_glob(&path_str, glob))
+        false
     }
 
-    fn matches_glob(path: &str, glob: &GlobPattern) -> bool {
-        Self::match_parts(path, &glob.parts, 0, 0)
+    fn matches_glob(&self, path: &Path) -> bool {
+        // Glob pattern matching (only if no fast matches)
+        let bytes = path.as_os_str().as_encoded_bytes();
+        self.glob_regexes.iter().any(|re| re.is_match(bytes))
     }
+}
 
-    fn match_parts(path: &str, parts: &[GlobPart], path_pos: usize, part_idx: usize) -> bool {
-        // If we've consumed all parts
-        if part_idx >= parts.len() {
-            return path_pos == path.len();
-        }
+#[cfg(test)]
+mod tests {
+    use super::*;
 
-        // If we've consumed all of the path but have parts left
-        if path_pos >= path.len() {
-            // Only OK if all remaining parts are stars
-            return parts[part_idx..]
-                .iter()
-                .all(|p| matches!(p, GlobPart::Star | GlobPart::DoubleStar));
-        }
+    #[test]
+    fn repeated_globs_enter_the_union_once() {
+        let matcher = PatternMatcher::new(&["*.tfstate*", "*~", " *.tfstate* ", "*~"]);
 
-        match &parts[part_idx] {
-            GlobPart::Literal(lit) => {
-                if path[path_pos..].starts_with(lit) {
-                    Self::match_parts(path, parts, path_pos + lit.len(), part_idx + 1)
-                } else {
-                    false
-                }
-            }
-            GlobPart::Question => {
-                let next_char_boundary = path[path_pos..]
-                    .char_indices()
-                    .nth(1)
-                    .map(|(i, _)| path_pos + i)
-                    .unwrap_or(path.len());
-
-                if path_pos < path.len() && !path.chars().nth(path_pos).unwrap_or('\0').eq(&'/') {
-                    Self::match_parts(path, parts, next_char_boundary, part_idx + 1)
-                } else {
-                    false
-                }
-            }
-            GlobPart::Star => {
-                // Try matching zero characters
-                if Self::match_parts(path, parts, path_pos, part_idx + 1) {
-                    return true;
-                }
-
-                // Try matching one or more characters (but not path separator)
-                for i in path_pos + 1..=path.len() {
-                    if path[path_pos..i].contains('/') {
-                        break;
-                    }
-                    if Self::match_parts(path, parts, i, part_idx + 1) {
-                        return true;
-                    }
-                }
-                false
-            }
-            GlobPart::DoubleStar => {
-                // Try matching zero characters
-                if Self::match_parts(path, parts, path_pos, part_idx + 1) {
-                    return true;
-                }
+        let unions: Vec<&str> = matcher.glob_regexes.iter().map(Regex::as_str).collect();
+        let expected = format!(
+            "^(?:{}|{})$",
+            PatternMatcher::glob_to_regex("*.tfstate*"),
+            PatternMatcher::glob_to_regex("*~")
+        );
+        assert_eq!(unions, [expected.as_str()]);
+    }
 
-                // Try matching one or more characters (including path separator)
-                for i in path_pos + 1..=path.len() {
-                    if Self::match_parts(path, parts, i, part_idx + 1) {
-                        return true;
-                    }
-                }
-                false
-            }
+    #[test]
+    fn oversized_unions_are_split() {
+        let fragments: Vec<String> = (0..16)
+            .map(|i| PatternMatcher::glob_to_regex(&format!("src/**/mod{}?x*/**/*.r?s", i)))
+            .collect();
+        let mut regexes = Vec::new();
+        PatternMatcher::compile_union(&fragments, 20_000, &mut regexes);
+
+        assert!(regexes.len() > 1);
+        for i in 0..16 {
+            let path = format!("src/a/mod{}ax/b/c.rxs", i);
+            assert!(regexes.iter().any(|re| re.is_match(path.as_bytes())));
         }
+        assert!(
+            !regexes
+                .iter()
+                .any(|re| re.is_match(b"src/a/mod16ax/b/c.rxs"))
+        );
     }
 }
@@ -1,79 +1,122 @@
-use std::collections::BTreeMap;
-use std::path::{Path, PathBuf};
+use std::borrow::Cow;
+use std::path::{Component, Path, PathBuf};
 
-#[derive(Debug)]
-enum TreeNode {
-    File,
-    Directory(BTreeMap<String, TreeNode>),
-}
+const FILE_ICON: &str = "📄 ";
+const DIRECTORY_ICON: &str = "📁 ";
 
 pub fn generate_directory_structure(files: &[PathBuf]) -> Vec<String> {
-    let mut structure = Vec::new();
     let current_dir = std::env::current_dir().unwrap_or_else(|_| PathBuf::from("."));
 
-    // Build tree structure
-    let mut root = BTreeMap::new();
-
-    for file in files {
-        let relative_path = file.strip_prefix(&current_dir).unwrap_or(file);
-
-        add_to_tree(&mut root, relative_path);
-    }
-
-    // Generate structure recursively
-    build_tree_lines(&root, &mut structure, "");
+    let relative_paths: Vec<&Path> = files
+        .iter()
+        .map(|file| file.strip_prefix(&current_dir).unwrap_or(file))
+        .collect();
 
-    structure
+    generate_directory_structure_relative(&relative_paths)
 }
 
-fn add_to_tree(tree: &mut BTreeMap<String, TreeNode>, path: &Path) {
-    let components: Vec<_> = path.components().collect();
-
-    if components.is_empty() {
-        return;
-    }
-
-    add_components_to_tree(tree, &components, 0);
+// For callers that already stripped the working directory from their paths
+pub fn generate_directory_structure_relative(relative_paths: &[&Path]) -> Vec<String> {
+    render_structure(relative_paths, false)
 }
 
-fn add_components_to_tree(
-    tree: &mut BTreeMap<String, TreeNode>,
-    components: &[std::path::Component],
-    index: usize,
-) {
-    if index >= components.len() {
-        return;
-    }
-
-    let component_name = components[index].as_os_str().to_string_lossy().to_string();
+// Same tree, with 📁/📄 markers for the terminal listing
+pub fn generate_file_tree_relative(relative_paths: &[&Path]) -> Vec<String> {
+    render_structure(relative_paths, true)
+}
 
-    if index == components.len() - 1 {
-        // This is a file
-        tree.insert(component_name, TreeNode::File);
+fn render_structure(relative_paths: &[&Path], with_icons: bool) -> Vec<String> {
+    // The tree is drawn straight from sorted, deduplicated paths
+    let paths: Cow<[&Path]> = if relative_paths.is_sorted_by(|a, b| a < b) {
+        Cow::Borrowed(relative_paths)
     } else {
-        // This is a directory
-        let entry = tree
-            .entry(component_name)
-            .or_insert_with(|| TreeNode::Directory(BTreeMap::new()));
-
-        if let TreeNode::Directory(subtree) = entry {
-            add_components_to_tree(subtree, components, index + 1);
+        let mut paths = relative_paths.to_vec();
+        paths.sort_unstable();
+        paths.dedup();
+        Cow::Owned(paths)
+    };
+
+    let components: Vec<Vec<Component>> = paths
+        .iter()
+        .map(|path| path.components().collect())
+        .collect();
+
+    // Number of leading directories each path shares with the next one
+    let shared_with_next: Vec<usize> = components
+        .windows(2)
+        .map(|pair| common_directories(&pair[0], &pair[1]))
+        .chain(std::iter::once(0))
+        .collect();
+
+    // Most a line adds around its name: the icon and a directory's trailing '/'
+    let decoration_len = if with_icons {
+        FILE_ICON.len().max(DIRECTORY_ICON.len() + '/'.len_utf8())
+    } else {
+        0
+    };
+
+    // Walk backwards: has_sibling[depth] is set when the entry at that depth
+    // is not its parent's last child. Lines are pushed in reverse and flipped
+    // at the end
+    let mut lines = Vec::new();
+    let mut has_sibling: Vec<bool> = Vec::new();
+    let mut prefix = String::new();
+    // Byte length of `prefix` in front of each depth
+    let mut prefix_ends = vec![0];
+
+    for (i, parts) in components.iter().enumerate().rev() {
+        let shared = shared_with_next[i];
+        has_sibling.truncate(shared);
+        prefix_ends.truncate(shared + 1);
+        prefix.truncate(prefix_ends[shared]);
+
+        for depth in shared..parts.len() {
+            has_sibling.push(depth == shared && i + 1 < components.len());
+            prefix.push_str(if has_sibling[depth] { "│   " } else { "    " });
+            prefix_ends.push(prefix.len());
         }
-    }
-}
 
-fn build_tree_lines(tree: &BTreeMap<String, TreeNode>, lines: &mut Vec<String>, prefix: &str) {
-    let items: Vec<_> = tree.iter().collect();
+        // Entries already drawn for the previous path are not repeated
+        let first_new = if i == 0 { 0 } else { shared_with_next[i - 1] };
+        let start = lines.len();
+
+        for (depth, component) in parts.iter().enumerate().skip(first_new) {
+            let indent = &prefix[..prefix_ends[depth]];
+            let connector = if has_sibling[depth] {
+                "├── "
+            } else {
+                "└── "
+            };
+            let name = component.as_os_str().to_string_lossy();
+            let is_file = depth + 1 == parts.len();
+
+            let mut line =
+                String::with_capacity(indent.len() + connector.len() + name.len() + decoration_len);
+            line.push_str(indent);
+            line.push_str(connector);
+            if with_icons {
+                line.push_str(if is_file { FILE_ICON } else { DIRECTORY_ICON });
+            }
+            line.push_str(&name);
+            if with_icons && !is_file {
+                line.push('/');
+            }
+            lines.push(line);
+        }
 
-    for (i, (name, node)) in items.iter().enumerate() {
-        let is_last = i == items.len() - 1;
-        let connector = if is_last { "└── " } else { "├── " };
+        lines[start..].reverse();
+    }
 
-        lines.push(format!("{}{}{}", prefix, connector, name));
+    lines.reverse();
+    lines
+}
 
-        if let TreeNode::Directory(subtree) = node {
-            let new_prefix = format!("{}{}", prefix, if is_last { "    " } else { "│   " });
-            build_tree_lines(subtree, lines, &new_prefix);
-        }
-    }
+// Leading components two paths share, not counting either file name
+fn common_directories(a: &[Component], b: &[Component]) -> usize {
+    let directories = a.len().min(b.len()).saturating_sub(1);
+    a.iter()
+        .zip(b)
+        .take(directories)
+        .take_while(|(a, b)| a == b)
+        .count()
 }
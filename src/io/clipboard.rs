@@ -1,8 +1,12 @@
 use anyhow::Result;
-use std::process::Command;
+use std::path::Path;
+use std::process::Stdio;
+use std::sync::LazyLock;
+use tokio::io::AsyncWriteExt;
+use tokio::process::Command;
 use tracing::{debug, info};
 
-#[derive(Debug)]
+#[derive(Clone, Copy, Debug)]
 enum ClipboardType {
     Wayland,
     X11,
@@ -11,6 +15,9 @@ enum ClipboardType {
     Unsupported,
 }
 
+// The environment and installed tools do not change while we run
+static CLIPBOARD_SYSTEM: LazyLock<ClipboardType> = LazyLock::new(detect_clipboard_system);
+
 fn detect_clipboard_system() -> ClipboardType {
     if cfg!(target_os = "windows") {
         return ClipboardType::Windows;
@@ -21,11 +28,11 @@ fn detect_clipboard_system() -> ClipboardType {
     }
 
     // For Linux/Unix systems
-    if std::env::var("WAYLAND_DISPLAY").is_ok() && command_exists("wl-copy") {
+    if std::env::var_os("WAYLAND_DISPLAY").is_some() && command_exists("wl-copy") {
         return ClipboardType::Wayland;
     }
 
-    if std::env::var("DISPLAY").is_ok() && command_exists("xclip") {
+    if std::env::var_os("DISPLAY").is_some() && command_exists("xclip") {
         return ClipboardType::X11;
     }
 
@@ -33,22 +40,33 @@ fn detect_clipboard_system() -> ClipboardType {
 }
 
 fn command_exists(cmd: &str) -> bool {
-    Command::new("which")
-        .arg(cmd)
-        .output()
-        .map(|output| output.status.success())
-        .unwrap_or(false)
+    std::env::var_os("PATH")
+        .is_some_and(|paths| std::env::split_paths(&paths).any(|dir| is_executable(&dir.join(cmd))))
+}
+
+// Only files that can actually be run count as installed
+#[cfg(unix)]
+fn is_executable(path: &Path) -> bool {
+    use std::os::unix::fs::PermissionsExt;
+
+    std::fs::metadata(path)
+        .is_ok_and(|metadata| metadata.is_file() && metadata.permissions().mode() & 0o111 != 0)
+}
+
+#[cfg(not(unix))]
+fn is_executable(path: &Path) -> bool {
+    path.is_file()
 }
 
 async fn copy_to_clipboard_native(content: &str) -> Result<()> {
-    let clipboard_type = detect_clipboard_system();
+    let clipboard_type = *CLIPBOARD_SYSTEM;
     debug!("Detected clipboard system: {:?}", clipboard_type);
 
-    let (cmd, args): (&str, Vec<&str>) = match clipboard_type {
-        ClipboardType::Wayland => ("wl-copy", vec![]),
-        ClipboardType::X11 => ("xclip", vec!["-selection", "clipboard"]),
-        ClipboardType::MacOS => ("pbcopy", vec![]),
-        ClipboardType::Windows => ("clip", vec![]),
+    let (cmd, args): (&str, &[&str]) = match clipboard_type {
+        ClipboardType::Wayland => ("wl-copy", &[]),
+        ClipboardType::X11 => ("xclip", &["-selection", "clipboard"]),
+        ClipboardType::MacOS => ("pbcopy", &[]),
+        ClipboardType::Windows => ("clip", &[]),
         ClipboardType::Unsupported => {
             return Err(anyhow::anyhow!(
                 "No supported clipboard system found. Install:\n\
@@ -60,20 +78,23 @@ async fn copy_to_clipboard_native(content: &str) -> Result<()> {
     };
 
     let mut child = Command::new(cmd)
-        .args(&args)
-        .stdin(std::process::Stdio::piped())
+        .args(args)
+        .stdin(Stdio::piped())
         .spawn()
         .map_err(|e| anyhow::anyhow!("Failed to spawn {}: {}", cmd, e))?;
 
-    if let Some(stdin) = child.stdin.as_mut() {
-        use std::io::Write;
+    // Stream the content into the tool's stdin; dropping the handle closes
+    // the pipe so the tool sees EOF before we wait on it
+    if let Some(mut stdin) = child.stdin.take() {
         stdin
             .write_all(content.as_bytes())
+            .await
             .map_err(|e| anyhow::anyhow!("Failed to write to {} stdin: {}", cmd, e))?;
     }
 
     let status = child
         .wait()
+        .await
         .map_err(|e| anyhow::anyhow!("Failed to wait for {}: {}", cmd, e))?;
 
     if !status.success() {
@@ -91,14 +112,14 @@ pub async fn copy_to_clipboard(content: &str) -> Result<()> {
 }
 
 pub async fn read_from_clipboard() -> Result<String> {
-    let clipboard_type = detect_clipboard_system();
+    let clipboard_type = *CLIPBOARD_SYSTEM;
     debug!("Reading from clipboard using: {:?}", clipboard_type);
 
-    let (cmd, args): (&str, Vec<&str>) = match clipboard_type {
-        ClipboardType::Wayland => ("wl-paste", vec![]),
-        ClipboardType::X11 => ("xclip", vec!["-selection", "clipboard", "-o"]),
-        ClipboardType::MacOS => ("pbpaste", vec![]),
-        ClipboardType::Windows => ("powershell", vec!["-command", "Get-Clipboard"]),
+    let (cmd, args): (&str, &[&str]) = match clipboard_type {
+        ClipboardType::Wayland => ("wl-paste", &[]),
+        ClipboardType::X11 => ("xclip", &["-selection", "clipboard", "-o"]),
+        ClipboardType::MacOS => ("pbpaste", &[]),
+        ClipboardType::Windows => ("powershell", &["-command", "Get-Clipboard"]),
         ClipboardType::Unsupported => {
             return Err(anyhow::anyhow!(
                 "No supported clipboard system found. Install:\n\
@@ -110,8 +131,9 @@ pub async fn read_from_clipboard() -> Result<String> {
     };
 
     let output = Command::new(cmd)
-        .args(&args)
+        .args(args)
         .output()
+        .await
         .map_err(|e| anyhow::anyhow!("Failed to run {}: {}", cmd, e))?;
 
     if !output.status.success() {
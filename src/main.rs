@@ -2,7 +2,11 @@ use anyhow::Result;
 use catnip::cli::commands::{cat, patch};
 use catnip::cli::{Args, Commands, Parser};
 
-#[tokio::main]
+// A single-threaded scheduler avoids starting a worker thread per core on
+// every run. The subdirectory walks and file reads still go to the blocking
+// pool; the few calls made inline (the root walk, stats of path arguments, the
+// output write) only block this one thread, which has nothing else to run
+#[tokio::main(flavor = "current_thread")]
 async fn main() -> Result<()> {
     tracing_subscriber::fmt()
         .with_env_filter(
@@ -1,7 +1,21 @@
 use std::path::Path;
 
+// Same rules as Path::extension: a leading dot alone does not start an extension
+pub fn file_extension(filename: &str) -> Option<&str> {
+    match filename.rfind('.') {
+        Some(0) | None => None,
+        Some(dot) => Some(&filename[dot + 1..]),
+    }
+}
+
 pub fn get_language_from_extension(path: &Path) -> &'static str {
-    match path.extension().and_then(|s| s.to_str()) {
+    // Lossy, like PatternMatcher, so a known extension still counts when
+    // another part of the name is not valid UTF-8
+    let Some(filename) = path.file_name().map(|name| name.to_string_lossy()) else {
+        return "text";
+    };
+
+    match file_extension(&filename) {
         Some("rs") => "rust",
         Some("py") | Some("pyw") => "python",
         Some("js") | Some("mjs") => "javascript",
@@ -48,17 +62,14 @@ pub fn get_language_from_extension(path: &Path) -> &'static str {
         Some("md") | Some("markdown") => "markdown",
         Some("tex") => "latex",
         Some("cmake") => "cmake",
-        _ => {
-            if let Some(filename) = path.file_name().and_then(|s| s.to_str()) {
-                match filename {
-                    "Makefile" | "makefile" => "makefile",
-                    "Dockerfile" => "dockerfile",
-                    "Jenkinsfile" => "groovy",
-                    _ => "text",
-                }
-            } else {
-                "text"
-            }
-        }
+        // None of the whole-name matches contain a dot, so they only need
+        // checking when there is no extension at all
+        None => match filename.as_ref() {
+            "Makefile" | "makefile" => "makefile",
+            "Dockerfile" => "dockerfile",
+            "Jenkinsfile" => "groovy",
+            _ => "text",
+        },
+        Some(_) => "text",
     }
 }
@@ -1,4 +1,14 @@
 use regex::Regex;
+use std::borrow::Cow;
+use std::sync::LazyLock;
+
+static LINE_COMMENT_RE: LazyLock<Regex> = LazyLock::new(|| Regex::new(r"//.*$").unwrap());
+static BLOCK_COMMENT_RE: LazyLock<Regex> = LazyLock::new(|| Regex::new(r"/\*.*?\*/").unwrap());
+static HASH_COMMENT_RE: LazyLock<Regex> = LazyLock::new(|| Regex::new(r"#.*$").unwrap());
+static DOUBLE_QUOTE_DOCSTRING_RE: LazyLock<Regex> =
+    LazyLock::new(|| Regex::new(r#"""".*?""""#).unwrap());
+static SINGLE_QUOTE_DOCSTRING_RE: LazyLock<Regex> =
+    LazyLock::new(|| Regex::new(r"'''.*?'''").unwrap());
 
 pub fn remove_comments_and_docstrings(
     content: &str,
@@ -10,45 +20,48 @@ pub fn remove_comments_and_docstrings(
         return content.to_string();
     }
 
-    let mut result = content.to_string();
-
-    if ignore_comments || ignore_docstrings {
-        match language {
-            "rust" | "javascript" | "typescript" | "java" | "kotlin" | "scala" | "c" | "cpp"
-            | "csharp" | "go" | "swift" | "dart" => {
-                if ignore_comments {
-                    let re = Regex::new(r"//.*$").unwrap();
-                    result = re.replace_all(&result, "").to_string();
+    // Stays borrowed until a pass actually removes something
+    let mut result = Cow::Borrowed(content);
 
-                    let re = Regex::new(r"/\*.*?\*/").unwrap();
-                    result = re.replace_all(&result, "").to_string();
-                }
+    match language {
+        "rust" | "javascript" | "typescript" | "java" | "kotlin" | "scala" | "c" | "cpp"
+        | "csharp" | "go" | "swift" | "dart" => {
+            if ignore_comments {
+                strip_matches(&mut result, &LINE_COMMENT_RE);
+                strip_matches(&mut result, &BLOCK_COMMENT_RE);
+            }
+        }
+        "python" => {
+            if ignore_comments {
+                strip_matches(&mut result, &HASH_COMMENT_RE);
             }
-            "python" => {
-                if ignore_comments {
-                    let re = Regex::new(r"#.*$").unwrap();
-                    result = re.replace_all(&result, "").to_string();
-                }
-                if ignore_docstrings {
-                    let re = Regex::new(r#"""".*?""""#).unwrap();
-                    result = re.replace_all(&result, "").to_string();
-                    let re = Regex::new(r"'''.*?'''").unwrap();
-                    result = re.replace_all(&result, "").to_string();
-                }
+            if ignore_docstrings {
+                strip_matches(&mut result, &DOUBLE_QUOTE_DOCSTRING_RE);
+                strip_matches(&mut result, &SINGLE_QUOTE_DOCSTRING_RE);
             }
-            "ruby" | "bash" | "sh" | "zsh" | "fish" => {
-                if ignore_comments {
-                    let re = Regex::new(r"#.*$").unwrap();
-                    result = re.replace_all(&result, "").to_string();
-                }
+        }
+        "ruby" | "bash" | "sh" | "zsh" | "fish" => {
+            if ignore_comments {
+                strip_matches(&mut result, &HASH_COMMENT_RE);
             }
-            _ => {}
         }
+        _ => {}
     }
 
-    result
-        .lines()
-        .filter(|line| !line.trim().is_empty())
-        .collect::<Vec<_>>()
-        .join("\n")
+    // Drop blank lines
+    let mut cleaned = String::with_capacity(result.len());
+    for line in result.lines().filter(|line| !line.trim().is_empty()) {
+        if !cleaned.is_empty() {
+            cleaned.push('\n');
+        }
+        cleaned.push_str(line);
+    }
+
+    cleaned
+}
+
+fn strip_matches(text: &mut Cow<str>, re: &Regex) {
+    if let Cow::Owned(stripped) = re.replace_all(text, "") {
+        *text = Cow::Owned(stripped);
+    }
 }
@@ -33,6 +33,30 @@ fn test_get_language_from_extension() {
         get_language_from_extension(Path::new("unknown.xyz")),
         "text"
     );
+    assert_eq!(
+        get_language_from_extension(Path::new("src/archive.tar.sh")),
+        "bash"
+    );
+    assert_eq!(get_language_from_extension(Path::new(".toml")), "text");
+}
+
+#[test]
+fn test_file_extension() {
+    assert_eq!(file_extension("main.rs"), Some("rs"));
+    assert_eq!(file_extension("archive.tar.gz"), Some("gz"));
+    assert_eq!(file_extension("trailing."), Some(""));
+    assert_eq!(file_extension(".gitignore"), None);
+    assert_eq!(file_extension("Makefile"), None);
+}
+
+#[cfg(unix)]
+#[test]
+fn test_get_language_from_non_utf8_file_name() {
+    use std::ffi::OsStr;
+    use std::os::unix::ffi::OsStrExt;
+
+    let path = Path::new(OsStr::from_bytes(b"\xff.rs"));
+    assert_eq!(get_language_from_extension(path), "rust");
 }
 
 #[test]
@@ -89,6 +113,13 @@ fn test_remove_comments_disabled() {
     assert_eq!(result, code);
 }
 
+#[test]
+fn test_remove_comments_drops_blank_lines() {
+    let code = "x = 1\n\n   \ny = 2\n\n";
+    let result = remove_comments_and_docstrings(code, "python", true, false);
+    assert_eq!(result, "x = 1\ny = 2");
+}
+
 #[tokio::test]
 async fn test_collect_files_single_file() {
     let temp_dir = TempDir::new().unwrap();
@@ -160,3 +191,172 @@ async fn test_concatenate_files() {
     assert!(result.contains("pub fn helper()"));
     assert!(result.contains("```rust"));
 }
+
+#[tokio::test]
+async fn test_collect_files_skips_empty_and_oversized() {
+    let temp_dir = TempDir::new().unwrap();
+    let temp_path = temp_dir.path();
+
+    fs::create_dir(temp_path.join("nested")).await.unwrap();
+    fs::write(temp_path.join("nested/main.rs"), "fn main() {}")
+        .await
+        .unwrap();
+    fs::write(temp_path.join("empty.rs"), "").await.unwrap();
+    fs::write(temp_path.join("large.rs"), vec![b'a'; 1024 * 1024 + 1])
+        .await
+        .unwrap();
+
+    let files = collect_files(&[temp_path.to_path_buf()], &[], &[], 1)
+        .await
+        .unwrap();
+
+    assert_eq!(files, vec![temp_path.join("nested/main.rs")]);
+}
+
+#[tokio::test]
+async fn test_concatenate_files_reports_unreadable_file() {
+    let temp_dir = TempDir::new().unwrap();
+    let valid = temp_dir.path().join("valid.rs");
+    let invalid = temp_dir.path().join("invalid.rs");
+
+    fs::write(&valid, "fn valid() {}").await.unwrap();
+    fs::write(&invalid, b"fn invalid() {}\xff\xfe")
+        .await
+        .unwrap();
+
+    let files = vec![invalid, valid];
+    let result = concatenate_files(&files, None, false, false).await.unwrap();
+
+    assert!(result.contains("*Error reading file:"));
+    assert!(!result.contains("fn invalid()"));
+    assert_eq!(result.matches("```rust\n").count(), 1);
+    assert!(result.contains("```rust\nfn valid() {}\n```"));
+}
+
+#[tokio::test]
+async fn test_collect_files_skips_binary_content() {
+    let temp_dir = TempDir::new().unwrap();
+    let temp_path = temp_dir.path();
+
+    fs::write(temp_path.join("text.rs"), "fn main() {}")
+        .await
+        .unwrap();
+    fs::write(temp_path.join("binary.rs"), b"fn main() {}\x00\x01")
+        .await
+        .unwrap();
+
+    // A NUL past the inspected prefix does not make the file binary
+    let mut late_nul = vec![b'a'; 2048];
+    late_nul.push(0);
+    fs::write(temp_path.join("late_nul.rs"), late_nul)
+        .await
+        .unwrap();
+
+    let mut files = collect_files(&[temp_path.to_path_buf()], &[], &[], 10)
+        .await
+        .unwrap();
+    files.sort();
+
+    assert_eq!(
+        files,
+        vec![temp_path.join("late_nul.rs"), temp_path.join("text.rs")]
+    );
+}
+
+#[tokio::test]
+async fn test_collect_files_walks_nested_directories() {
+    let temp_dir = TempDir::new().unwrap();
+    let temp_path = temp_dir.path();
+
+    for dir in ["src/core", "web/node_modules/pkg", "docs"] {
+        fs::create_dir_all(temp_path.join(dir)).await.unwrap();
+    }
+    for file in [
+        "Cargo.toml",
+        "src/lib.rs",
+        "src/core/mod.rs",
+        "web/app.js",
+        "web/node_modules/pkg/index.js",
+        "docs/guide.md",
+    ] {
+        fs::write(temp_path.join(file), "content").await.unwrap();
+    }
+
+    let mut files = collect_files(&[temp_path.to_path_buf()], &[], &[], 10)
+        .await
+        .unwrap();
+    files.sort();
+
+    let expected: Vec<_> = [
+        "Cargo.toml",
+        "docs/guide.md",
+        "src/core/mod.rs",
+        "src/lib.rs",
+        "web/app.js",
+    ]
+    .iter()
+    .map(|file| temp_path.join(file))
+    .collect();
+    assert_eq!(files, expected);
+}
+
+#[tokio::test]
+async fn test_concatenate_files_writes_output_file() {
+    let temp_dir = TempDir::new().unwrap();
+    let source = temp_dir.path().join("main.rs");
+    let output = temp_dir.path().join("out.md");
+
+    fs::write(&source, "fn main() {}").await.unwrap();
+
+    let result = concatenate_files(&[source], output.to_str(), false, false)
+        .await
+        .unwrap();
+
+    assert_eq!(fs::read_to_string(&output).await.unwrap(), result);
+}
+
+#[tokio::test]
+async fn test_collect_files_sorted_and_deduplicated() {
+    let temp_dir = TempDir::new().unwrap();
+    let temp_path = temp_dir.path();
+
+    fs::create_dir(temp_path.join("a")).await.unwrap();
+    for file in ["a/b.rs", "a-b.rs", "c.rs"] {
+        fs::write(temp_path.join(file), "content").await.unwrap();
+    }
+
+    let files = collect_files(
+        &[temp_path.to_path_buf(), temp_path.join("c.rs")],
+        &[],
+        &[],
+        10,
+    )
+    .await
+    .unwrap();
+
+    let expected: Vec<_> = ["a/b.rs", "a-b.rs", "c.rs"]
+        .iter()
+        .map(|file| temp_path.join(file))
+        .collect();
+    assert_eq!(files, expected);
+}
+
+#[tokio::test]
+async fn test_concatenate_files_strips_docstrings_in_order() {
+    let temp_dir = TempDir::new().unwrap();
+    let files: Vec<_> = (0..40)
+        .map(|i| temp_dir.path().join(format!("module_{:02}.py", i)))
+        .collect();
+    for (i, file) in files.iter().enumerate() {
+        let content = format!("'''Module {}'''\nVALUE = {}\n", i, i);
+        fs::write(file, content).await.unwrap();
+    }
+
+    let result = concatenate_files(&files, None, false, true).await.unwrap();
+
+    assert!(!result.contains("'''"));
+    let positions: Vec<_> = (0..40)
+        .map(|i| result.find(&format!("VALUE = {}\n", i)).unwrap())
+        .collect();
+    assert!(positions.windows(2).all(|pair| pair[0] < pair[1]));
+}
@@ -88,3 +88,63 @@ fn test_performance_with_patterns() {
         duration
     );
 }
+
+#[test]
+fn test_multiple_glob_patterns_combined() {
+    let matcher = PatternMatcher::new(&[
+        "src/*.rs".to_string(),
+        "docs/**/*.md".to_string(),
+        "*.tfstate*".to_string(),
+    ]);
+
+    assert!(matcher.matches_path(&PathBuf::from("src/main.rs")));
+    assert!(matcher.matches_path(&PathBuf::from("docs/guide/intro.md")));
+    assert!(matcher.matches_path(&PathBuf::from("docs/a/b/c.md")));
+    assert!(matcher.matches_path(&PathBuf::from("terraform.tfstate.backup")));
+
+    assert!(!matcher.matches_path(&PathBuf::from("docs/readme.txt")));
+    assert!(!matcher.matches_path(&PathBuf::from("lib/main.rs")));
+}
+
+#[test]
+fn test_glob_literals_are_escaped() {
+    let matcher = PatternMatcher::new(&["src/(a+b)?.rs".to_string()]);
+
+    assert!(matcher.matches_path(&PathBuf::from("src/(a+b)x.rs")));
+    assert!(!matcher.matches_path(&PathBuf::from("src/aab.rs")));
+}
+
+#[test]
+fn test_last_component_matching() {
+    let matcher = PatternMatcher::new(&[
+        "node_modules".to_string(),
+        ".git".to_string(),
+        "*.egg-info".to_string(),
+    ]);
+
+    assert!(matcher.matches_last_component(&PathBuf::from("project/node_modules")));
+    assert!(matcher.matches_last_component(&PathBuf::from("project/.git")));
+    assert!(matcher.matches_last_component(&PathBuf::from("project/catnip.egg-info")));
+
+    // Parents are expected to have been checked by the caller already
+    assert!(!matcher.matches_last_component(&PathBuf::from("node_modules/pkg")));
+    assert!(!matcher.matches_last_component(&PathBuf::from("project/src")));
+}
+
+#[test]
+fn test_extension_matching_ignores_leading_dot() {
+    let matcher = PatternMatcher::new(&["*.env".to_string(), "*.gz".to_string()]);
+
+    assert!(matcher.matches_path(&PathBuf::from("config/local.env")));
+    assert!(matcher.matches_path(&PathBuf::from("archive.tar.gz")));
+    assert!(!matcher.matches_path(&PathBuf::from(".env")));
+}
+
+#[test]
+fn test_glob_patterns_with_unicode_paths() {
+    let matcher = PatternMatcher::new(&["docs/*.md".to_string(), "src/?.rs".to_string()]);
+
+    assert!(matcher.matches_path(&PathBuf::from("docs/überblick.md")));
+    assert!(matcher.matches_path(&PathBuf::from("src/é.rs")));
+    assert!(!matcher.matches_path(&PathBuf::from("src/éé.rs")));
+}
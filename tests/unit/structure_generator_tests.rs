@@ -1,5 +1,7 @@
-use catnip::core::structure_generator::generate_directory_structure;
-use std::path::PathBuf;
+use catnip::core::structure_generator::{
+    generate_directory_structure, generate_file_tree_relative,
+};
+use std::path::{Path, PathBuf};
 
 #[test]
 fn test_generate_directory_structure_simple() {
@@ -50,3 +52,62 @@ fn test_generate_directory_structure_single_file() {
     assert_eq!(structure.len(), 1);
     assert!(structure[0].contains("main.rs"));
 }
+
+#[test]
+fn test_generate_file_tree_with_icons() {
+    let files = [Path::new("src/main.rs"), Path::new("Cargo.toml")];
+    let structure = generate_file_tree_relative(&files);
+
+    assert_eq!(
+        structure,
+        vec!["├── 📄 Cargo.toml", "└── 📁 src/", "    └── 📄 main.rs"]
+    );
+}
+
+#[test]
+fn test_generate_directory_structure_prefixes() {
+    let files = vec![
+        PathBuf::from("a/b/c.rs"),
+        PathBuf::from("a/d.rs"),
+        PathBuf::from("e/f.rs"),
+    ];
+
+    let structure = generate_directory_structure(&files);
+
+    assert_eq!(
+        structure,
+        vec![
+            "├── a",
+            "│   ├── b",
+            "│   │   └── c.rs",
+            "│   └── d.rs",
+            "└── e",
+            "    └── f.rs",
+        ]
+    );
+}
+
+#[test]
+fn test_generate_directory_structure_unsorted_input() {
+    let files = vec![
+        PathBuf::from("f.rs"),
+        PathBuf::from("a/e.rs"),
+        PathBuf::from("a/b/d.rs"),
+        PathBuf::from("a/b/c.rs"),
+        PathBuf::from("a/e.rs"),
+    ];
+
+    let structure = generate_directory_structure(&files);
+
+    assert_eq!(
+        structure,
+        vec![
+            "├── a",
+            "│   ├── b",
+            "│   │   ├── c.rs",
+            "│   │   └── d.rs",
+            "│   └── e.rs",
+            "└── f.rs",
+        ]
+    );
+}